@@ -334,20 +334,49 @@ END OF README.txt for v 1.1.1
 
 import sys
 import os
+import csv
+import time
+import glob
+import warnings
+from datetime import datetime, timedelta
 
 # ----------------------------- Date Conversion -----------------------------
-def string_to_date(datetext):
-    date, time = datetext[:17].split()
-    year, month, day = [int(x) for x in date.split('-')]
-    hour, minute = [int(x) for x in time.split(':')]
-    return year, month, day, hour, minute, 0
-
-def is_valid_date(datetext):
+def _parse_iso(datetext):
+    '''
+    Parse an ISO date string (e.g. '2025-08-01T00:00:00' or '2025-08-01 00:00')
+    and return (year, month, day, hour, minute, second), or None if it is not valid
+    '''
     try:
-        string_to_date(datetext)
-        return True
-    except Exception:
-        return False
+        dt = datetime.fromisoformat(datetext)
+    except ValueError:
+        return None
+    return dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second
+
+def _write_csv(df, filename):
+    '''
+    Write a dataframe to a csv file through a 1 MiB write buffer. A frame of
+    float64 and datetime64 columns is formatted by csv.writer from plain Python
+    lists, a block of rows at a time, which gives the same text as
+    df.to_csv(index=False) for those dtypes; any other frame is written by to_csv
+    '''
+    with open(filename, 'w', encoding='utf-8', newline='', buffering=1<<20) as fout:
+        dates = [dtype.kind == 'M' for dtype in df.dtypes]
+        # float32 would print with more digits through csv.writer than through
+        # to_csv. The float columns are model output and are never missing, but
+        # a missing datetime would be written as NaT instead of an empty field
+        fast = (all(is_date or dtype == 'float64' for is_date, dtype in zip(dates, df.dtypes))
+                and not any(df.iloc[:, i].hasnans for i, is_date in enumerate(dates) if is_date))
+        if not fast:
+            df.to_csv(fout, index=False)
+            return
+        arrays = [df.iloc[:, i].astype(str).to_numpy() if is_date else df.iloc[:, i].to_numpy()
+                  for i, is_date in enumerate(dates)]
+        writer = csv.writer(fout, lineterminator=os.linesep)
+        writer.writerow(df.columns)
+        # about a million values per block bounds the memory of the lists
+        nrows = max(1, 1000000 // max(1, len(arrays)))
+        for start in range(0, len(df), nrows):
+            writer.writerows(zip(*[a[start:start + nrows].tolist() for a in arrays]))
 
 def run_pstide(**kwargs):
     '''
@@ -409,28 +438,14 @@ def run_pstide(**kwargs):
                 to LiveOcean ROMS subgrid        
     '''
     
-    import sys
-    import os
-    import pickle
-    from pstide import cal_to_jd, hms_to_fday, lt_to_ut, predict_tides
-    from pstide import ps_segments, segment_locations
-    from datetime import datetime, timedelta
     import pandas as pd
     import numpy as np
-    import matplotlib.pyplot as plt
-    import warnings
-    from pstide import ut_to_lt, jd_to_ISO, jd_to_cal, fday_to_hms
-    from pstide import gridded_predictions
-    import time
-    from time import ctime
-    import pytz
 
     # Set start time for calculating run time
     start_time = time.time()
             
     # get current datetime rounded to next nearest hour for default start
-    iso_date = datetime.now().isoformat()    
-    dt = datetime.fromisoformat(iso_date)
+    dt = datetime.now()
     if dt.minute > 0 or dt.second > 0 or dt.microsecond > 0:
         dt = dt.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
     iso_date = dt.isoformat()
@@ -471,6 +486,11 @@ def run_pstide(**kwargs):
         # raise ValueError(f"Unexpected argument(s): {unexpected}")
         print(f"Unexpected input kwargs: {unexpected}")
 
+    # Units of tide height for printing and plotting
+    scale = 3.2808 if options['feet'] else 1.0
+    units = 'ft' if options['feet'] else 'm'
+    units_long = 'feet' if options['feet'] else 'meters'
+
     # If no segment specified for gridded predictions then use Elliott Bay
     if options['segment'] == None and options['grid']:
         options['segment'] = 497
@@ -541,17 +561,29 @@ def run_pstide(**kwargs):
             print(f'Warning - the nearest segment to the target lat {target_lat} and lon {target_lon} is {closest_distance:.3f} degrees from the target')
         options['segment'] = df_segments.iloc[closest_index]['segment']
 
-    # Parse the ISO string into a datetime object and calc jd
-    iso_string = options['start']
-    dt = datetime.fromisoformat(iso_string)
-    year = dt.year
-    month = dt.month
-    day = dt.day
-    hour = dt.hour
-    minute = dt.minute
-    second = 0
-    jd = cal_to_jd(year, month, day + hms_to_fday(hour, minute, second))
-    jd_utc = lt_to_ut(jd) if options['pacific'] else jd
+    # Parse the ISO string of the start datetime and calc jd
+    parsed = _parse_iso(options['start'])
+    if parsed is None:
+        print(f"ERROR: Start datetime {options['start']} is not a valid ISO date.")
+        sys.exit()
+    year, month, day, hour, minute, second = parsed
+    if options['pacific']:
+        # convert the local start time to UTC with the same tz database
+        # rules that are used for the Datetime PST/PDT output column
+        # at seconds resolution so that starts outside the nanosecond range
+        # of pandas (years before 1677 or after 2262) do not overflow
+        wall = pd.Timestamp(np.datetime64(datetime(year, month, day, hour, minute, second), 's'))
+        if wall >= pd.Timestamp.min:
+            dt_start = wall.tz_localize(
+                'US/Pacific', ambiguous=True, nonexistent='shift_forward').tz_convert('UTC')
+        else:
+            # pandas localizes times before its nanosecond range incorrectly,
+            # and US/Pacific had a fixed offset then, so subtract that offset
+            offset = wall.tz_localize('UTC').tz_convert('US/Pacific').utcoffset()
+            dt_start = (wall - offset).tz_localize('UTC')
+        year, month, day = dt_start.year, dt_start.month, dt_start.day
+        hour, minute, second = dt_start.hour, dt_start.minute, dt_start.second
+    jd_utc = cal_to_jd(year, month, day + hms_to_fday(hour, minute, second))
 
     # -------- dataframe of tides in all segments --------
 
@@ -560,50 +592,39 @@ def run_pstide(**kwargs):
     print('Calculating tides...')
     seg_list = df_segments['segment'].astype(str).tolist()
     col_list = ['Julian Day','Datetime PST/PDT','Datetime UTC'] + seg_list
-    df = pd.DataFrame(columns=col_list)
-    keys_list = list(harmonic_constants.keys())
-    step_days = options['interval'] / (24.0 * 60.0)
-    series_length = int(options['length'] / step_days)
-    # print('len(keys_list): ', len(keys_list))
-    # print('series_length: ',series_length)
-    for i, key in enumerate(keys_list): 
-        segdata = harmonic_constants[key]
-        tideseries = predict_tides(segdata['hcs'], jd_utc, options['interval'], options['length'])
-        if i == 0:
-            # Julian Day
-            df['Julian Day'] = np.round(np.array(tideseries)[:, 0], decimals=8)
-            # Loop through rows to fill in datetimes in PST/PDT and UTC
-            for index, row in df.iterrows():
-                # Datetime US/Pacific PDT/PST
-                jd_local, zone = ut_to_lt(row['Julian Day'])
-                datetext = jd_to_ISO(jd_local, zone, "minute")
-                dt = datetime.strptime(datetext, '%Y-%b-%d %H:%M %Z')
-                timezone = pytz.timezone('US/Pacific')
-                localized_dt = timezone.localize(dt)
-                df.at[index, 'Datetime PST/PDT'] = localized_dt 
-                # Datetime UTC
-                year, month, fday = jd_to_cal(row['Julian Day'])
-                hour, minute, _ = fday_to_hms(fday)
-                datetext = f"{year:04d}-{month:02d}-{int(fday):02d} {hour:02d}:{minute:02d} UTC"
-                dt = datetime.strptime(datetext, '%Y-%m-%d %H:%M %Z')
-                timezone = pytz.timezone('UTC')
-                localized_dt = timezone.localize(dt)
-                df.at[index, 'Datetime UTC'] = localized_dt  
-            # 1st segment tides
-            df[key] = np.round(np.array(tideseries)[:, 1], decimals=8)
-        else:
-            # 2nd through last segment tides
-            df[key] = np.round(np.array(tideseries)[:, 1], decimals=8)
+    columns = {}
+    # harmonic constants of all segments as (segment, constituent) arrays,
+    # reordered to the column order of seg_list
+    keys_list, H_all, G_all, mean_all = _segment_arrays()
+    row = {key: i for i, key in enumerate(keys_list)}
+    order = [row[key] for key in seg_list]
+    JD, tides = predict_tides_batch(H_all[order], G_all[order], mean_all[order],
+        jd_utc, options['interval'], options['length'])
+    # Julian Day
+    columns['Julian Day'] = np.round(JD, decimals=8)
+    # Datetimes in UTC and US/Pacific PDT/PST for all rows at once,
+    # rounded to the nearest second and kept at seconds resolution so that
+    # dates outside the nanosecond range of pandas do not overflow
+    unix_sec = (columns['Julian Day'] - 2440587.5) * 86400.0
+    dt_utc = pd.DatetimeIndex(np.round(unix_sec).astype('int64').astype('datetime64[s]')).tz_localize('UTC')
+    columns['Datetime PST/PDT'] = dt_utc.tz_convert('US/Pacific')
+    columns['Datetime UTC'] = dt_utc
+    datetext = dt_utc[0].strftime('%Y-%m-%d %H:%M %Z')
+    # tides in each segment, rounded in place and wrapped without a copy,
+    # then the time columns are inserted in front
+    np.round(tides, decimals=8, out=tides)
+    df = pd.DataFrame(tides, columns=seg_list, copy=False)
+    for i, key in enumerate(col_list[:3]):
+        df.insert(i, key, columns[key])
     if options['outfile_all']:
-        df.to_csv(options['outfile_all'], index=False)  
+        _write_csv(df, options['outfile_all'])
     
     # -------- dataframe of tides at selected location --------
 
     # convert segment to str and check that it is in the list of keys for ps_segments.dat
     if not isinstance(options['segment'], str):
         options['segment'] = str(options['segment'])
-    keys_list = list(harmonic_constants.keys())
-    ctrl = options['segment'] in keys_list
+    ctrl = options['segment'] in harmonic_constants
     if not ctrl:
         print(f'ERROR: Segment {options['segment']} is not a valid segment number between 1 and 589.')
         sys.exit()
@@ -619,7 +640,7 @@ def run_pstide(**kwargs):
     df_selected['Tide (meters MLLW)'] = df[options['segment']]
     df_selected['Tide (feet MLLW)'] = np.round(df[options['segment']] / 0.3048, decimals=8)
     if options['outfile']:
-        df_selected.to_csv(options['outfile'], index=False)  
+        _write_csv(df_selected, options['outfile'])
     
     # -------- print the station info at selected location --------
 
@@ -637,9 +658,9 @@ def run_pstide(**kwargs):
         print(f"Minor constituents inferred from {refstation}")
         print(f"Starting time: {datetext}")
         print(f"Time step: {options['interval']:.2f} min  Length: {options['length']:.2f} days")
-        print(f"Mean water level: {mean * (3.2808 if options['feet'] else 1):.2f} {'ft' if options['feet'] else 'm'}\n")
-        print(f"Predictions generated: {ctime()} (System)")
-        print(f"Heights in {'feet' if options['feet'] else 'meters'} above MLLW")    
+        print(f"Mean water level: {mean * scale:.2f} {units}\n")
+        print(f"Predictions generated: {time.ctime()} (System)")
+        print(f"Heights in {units_long} above MLLW")    
         if tzname == "UTC":
             print(f"Prediction date and time in Universal Time (UTC)")
             # print(f"\nDatetime{delim}Height\n")
@@ -655,14 +676,12 @@ def run_pstide(**kwargs):
 
     # optional plot of tide time series
     if options['show_plot']:
+        # matplotlib is only imported when a plot is requested
+        import matplotlib.pyplot as plt
         # title_str = 'Tide Height at ' + segdata['name']
         title_str = 'Tide at ' + segdata['name'] + ' (segment ' + options['segment'] + ')'
-        if options['feet']:
-            y = df_selected['Tide (feet MLLW)']
-            ylabel_str = 'Tide (feet MLLW)'
-        else:
-            y = df_selected['Tide (meters MLLW)']
-            ylabel_str = 'Tide (meters MLLW)'            
+        ylabel_str = f'Tide ({units_long} MLLW)'
+        y = df_selected[ylabel_str]
         if options['pacific']:
             x = df_selected['Datetime PST/PDT']
             xlabel_str = 'Date (US/Pacific PST or PDT)'
@@ -698,7 +717,7 @@ def run_pstide(**kwargs):
     result = {
         'options': options,
         'segdata': segdata,
-        'harmonic_constants': ps_segments(),
+        'harmonic_constants': harmonic_constants,
         'segment_locations': segment_locations(),
         'tides_all_segments': df,
         'tides_selected_segment': df_selected
@@ -731,13 +750,8 @@ def gridded_predictions(result):
     import matplotlib.colors as mcolors
     import cartopy.crs as ccrs
     from scipy.interpolate import griddata
-    import os
     from PIL import Image
-    import xarray as xr
     import pandas as pd    
-    from pstide import liveocean_grid
-    import warnings
-    import glob
 
     print('Interpolating predictions to the ROMS grid, this could take a few minutes...')
 
@@ -1058,6 +1072,14 @@ def gridded_predictions(result):
                     os.remove(file_path)
             except Exception as e:
                 print(f"Error deleting {file_path}: {e}")
+
+        # datetime strings for the frame titles, formatted for all time steps at once
+        if options['pacific']:
+            dt_strs = df['Datetime PST/PDT'].dt.strftime('%Y-%m-%d %H:%M %Z')
+        elif options['julian']:
+            dt_strs = df['Julian Day'].map('JD {:12.4f}'.format)
+        else:
+            dt_strs = df['Datetime UTC'].dt.strftime('%Y-%m-%d %H:%M %Z')
                 
         for i in range(n_times):
         
@@ -1087,16 +1109,7 @@ def gridded_predictions(result):
             gl.ylabel_style = {'size': 10, 'color': 'black'}
         
             # title with datetime
-            if options['pacific']:
-                dt = df.at[i, 'Datetime PST/PDT']
-                dt_str = dt.strftime('%Y-%m-%d %H:%M %Z')
-            elif options['julian']:
-                dt = df.at[i, 'Julian Day']
-                dt_str = f"JD {dt:12.4f}"
-            else:
-                dt = df.at[i, 'Datetime UTC']
-                dt_str = dt.strftime('%Y-%m-%d %H:%M %Z')        
-            plt.title("Puget Sound Tides " + dt_str, fontsize=18)   
+            plt.title("Puget Sound Tides " + dt_strs[i], fontsize=18)   
         
             # Create the inset plot of tides at selected location
             inset_ax = fig.add_axes([0.19, 0.75, 0.2, 0.074])  # [x, y, width, height]
@@ -1275,7 +1288,6 @@ def map_segments(
     import matplotlib.colors as mcolors
     import cartopy.crs as ccrs
     import cartopy.feature as cfeature
-    from pstide import segment_locations, liveocean_grid
 
     # load roms grid
     subgrid = liveocean_grid()
@@ -1347,6 +1359,9 @@ def map_segments(
 # 1998, Willmann-Bell, Inc.
 #------------------------------------------------------------------------------ 
 
+import functools
+import math
+
 # Calendar Constants (modify for your purposes)
 standard_timezone_name = 'PST'
 standard_timezone_offset = 8.0/24.0
@@ -1374,7 +1389,7 @@ def cal_to_jd(yr, mo = 1, day = 1, gregorian = True):
         mo = mo + 12
     if gregorian:
         A = int(yr / 100)
-        B = 2 - A + (A / 4)
+        B = 2 - A + int(A / 4)
     else:
         B = 0
     return int(365.25 * (yr + 4716)) + int(30.6001 * (mo + 1)) + day + B - 1524.5
@@ -1476,12 +1491,27 @@ def fday_to_hms(days):
         seccond : 0..59
     
     """
-    import math
-    dfrac = days % 1
-    (hfrac, hours) = math.modf(dfrac * 24.0)
-    (mfrac, minutes) = math.modf(hfrac * 60.0)
-    seconds = mfrac * 60.0
-    return((int(hours), int(minutes), seconds))
+    seconds = (days % 1) * seconds_per_day
+    hours = int(seconds // 3600.0)
+    seconds = seconds - hours * 3600.0
+    minutes = int(seconds // 60.0)
+    return((hours, minutes, seconds - minutes * 60.0))
+
+def fday_to_hms_vec(days):
+    """Array version of fday_to_hms.
+
+    Parameters:
+        days : array of fractional days
+        
+    Returns:
+        hour, minute and second arrays (hour and minute as integers)
+    
+    """
+    seconds = (np.asarray(days, dtype=np.float64) % 1) * seconds_per_day
+    hours = seconds // 3600.0
+    seconds = seconds - hours * 3600.0
+    minutes = seconds // 60.0
+    return((hours.astype(int), minutes.astype(int), seconds - minutes * 60.0))
 
 def hms_to_fday(hr, mn, sec):
     """Convert hours-minutes-seconds into a fractional day 0.0..1.0.
@@ -1495,27 +1525,16 @@ def hms_to_fday(hr, mn, sec):
         fractional day, 0.0..1.0
     
     """
-    minutes_per_day = 60.0 * 24.0
-    seconds_per_day = minutes_per_day * 60.0
-    
     return ((hr  / 24.0) + (mn  / minutes_per_day) + (sec / seconds_per_day))
 
-def is_dst(jd, st_offset=8.0/24.0, dt_offset=7.0/24.0):
-    """Is this instant within the Daylight Savings Time period as used in the US?
+@functools.lru_cache(maxsize=256)
+def _dst_bounds(yr, st_offset=8.0/24.0, dt_offset=7.0/24.0):
+    """Return the (start, stop) Julian Days in Universal Time of the Daylight
+    Savings Time period in year yr. Cached, since a time series only spans a
+    handful of years.
     
-    Parameters:
-        jd : Julian Day number representing an instant in Universal Time
-        
-    Return:
-        True if Daylight Savings Time is in effect, false otherwise.
-           
     """
 
-    #
-    # What year is this?
-    # 
-    yr, mon, day = jd_to_cal(jd)
-    
     #
     # First day in April
     # 
@@ -1538,9 +1557,6 @@ def is_dst(jd, st_offset=8.0/24.0, dt_offset=7.0/24.0):
     #
     start = start + st_offset
 
-    if jd < start:
-        return False
-        
     #
     # Last day in October
     #
@@ -1562,10 +1578,22 @@ def is_dst(jd, st_offset=8.0/24.0, dt_offset=7.0/24.0):
     #
     stop = stop + dt_offset
     
-    if jd < stop:
-        return True
+    return start, stop
+
+
+def is_dst(jd, st_offset=8.0/24.0, dt_offset=7.0/24.0):
+    """Is this instant within the Daylight Savings Time period as used in the US?
+    
+    Parameters:
+        jd : Julian Day number representing an instant in Universal Time
         
-    return False
+    Return:
+        True if Daylight Savings Time is in effect, false otherwise.
+           
+    """
+    yr, mon, day = jd_to_cal(jd)
+    start, stop = _dst_bounds(yr, st_offset, dt_offset)
+    return start <= jd < stop
         
 
 def is_leap_year(yr, gregorian = True):
@@ -1580,9 +1608,28 @@ def is_leap_year(yr, gregorian = True):
         
     """
     yr = int(yr)
+    # divisible by 100 <=> by 4 and 25; by 400 <=> by 16 and 25
     if gregorian:
-        return (yr % 4 == 0) and ((yr % 100 != 0) or (yr % 400 == 0))
+        return (yr & 3) == 0 and ((yr % 25 != 0) or (yr & 15) == 0)
     else:    
+        return (yr & 3) == 0
+
+
+def is_leap_year_vec(yr, gregorian = True):
+    """Array version of is_leap_year.
+    
+    Parameters:
+        yr        : array of years
+        gregorian : If True, use Gregorian calendar, else use Julian calendar (default: True)
+        
+    Return:
+        boolean array, True where the year is a leap year.
+        
+    """
+    yr = np.asarray(yr).astype(np.int64)
+    if gregorian:
+        return (yr % 4 == 0) & ((yr % 100 != 0) | (yr % 400 == 0))
+    else:
         return yr % 4 == 0
         
 
@@ -1601,8 +1648,6 @@ def jd_to_cal(jd, gregorian = True):
     Return a tuple (year, month, day). 
     
     """
-    import math
-    
     jd = jd + 1e-9
     F, Z = math.modf(jd + 0.5)
     Z = int(Z)
@@ -1627,6 +1672,35 @@ def jd_to_cal(jd, gregorian = True):
     return yr, mo, day
 
 
+def jd_to_cal_vec(jd, gregorian = True):
+    """Array version of jd_to_cal.
+    
+    Parameters:
+        jd        : array of Julian Day numbers
+        gregorian : If True, use Gregorian calendar, else use Julian calendar (default: True)
+        
+    Return:
+        year, month and day (may be fractional) arrays.
+    
+    """
+    jd = np.asarray(jd, dtype=np.float64) + 1e-9
+    Z = np.trunc(jd + 0.5)
+    F = jd + 0.5 - Z
+    if gregorian:
+        alpha = np.trunc((Z - 1867216.25) / 36524.25)
+        A = Z + 1 + alpha - np.trunc(alpha / 4)
+    else:
+        A = Z
+    B = A + 1524
+    C = np.trunc((B - 122.1) / 365.25)
+    D = np.trunc(365.25 * C)
+    E = np.trunc((B - D) / 30.6001)
+    day = B - D - np.trunc(30.6001 * E) + F
+    mo = np.where(E < 14, E - 1, E - 13)
+    yr = np.where(mo > 2, C - 4716, C - 4715)
+    return yr.astype(int), mo.astype(int), day
+
+
 def jd_to_day_of_week(jd):
     """Return the day of week for a Julian Day Number.
     
@@ -1724,11 +1798,9 @@ def sidereal_time_greenwich(jd):
     
     """
     T = jd_to_jcent(jd)
-    T2 = T * T
-    T3 = T2 * T
-    theta0 = 280.46061837 + 360.98564736629 * (jd - 2451545.0)  + 0.000387933 * T2 - T3 / 38710000
+    theta0 = 280.46061837 + 360.98564736629 * (jd - 2451545.0) + T * T * (0.000387933 - T / 38710000.0)
     theta0 = theta0 % 360
-    result = radians(theta0)
+    result = math.radians(theta0)
     return(result)
 
 
@@ -1780,9 +1852,92 @@ def ut_to_lt(jd):
 #  the inland waters of western Washington. Seattle, Washington,
 #  Pacific Marine Environmental Laboratory: 51.
 # from calendar import hms_to_fday, cal_to_jd
-from math import cos, sin, tan, acos, asin, atan, sqrt
+import numpy as np
+
+# numexpr is optional; it evaluates the cos/sin of the phase arrays in
+# multithreaded (and, with Intel VML, SIMD) chunks. It is imported on
+# first use so that importing pstide does not pay for it
+@functools.lru_cache(maxsize=1)
+def _numexpr():
+    ' returns the numexpr module, or None if it is not installed '
+    try:
+        import numexpr
+    except ImportError:
+        return None
+    return numexpr
 
-def predict_tides(hcs, jd, step_mins, series_days):
+# numba is optional too; without it the tide kernel runs in plain NumPy.
+# Loading the compiled kernel costs a few tenths of a second per process,
+# so it is only used for series with at least this many (time step,
+# constituent) terms, and NumPy is used below that
+_NUMBA_MIN_TERMS = 10000000
+
+# Number of harmonic constituents (full set); a module-level literal so
+# that compiled kernels see a fixed trip count for the constituent loop
+NC = 37
+
+# Harmonic constituents in the order used by v2000 and node2000
+constit = ('SA','SSA','MM','MSF','MF','2Q1','Q1','RHO','O1','M1','P1','S1',
+           'K1','J1','OO1','2N2','MU2','N2','NU2','M2','LAM2','L2','T2','S2',
+           'R2','K2','2SM2','2MK3','M3','MK3','MN4','M4','MS4','S4','M6','S6',
+           'M8')
+
+# V0 phase table (Schureman, 1976): coefficients of the mean longitudes
+# s, h, p, p1, a constant phase (deg) and the multiple of the daily phase
+# for each constituent, in the order of constit
+_V_TABLE = np.array([
+    #   s      h      p     p1    const  daily
+    [  0.0,   1.0,   0.0,   0.0,    0.0, 0.0],   # SA
+    [  0.0,   2.0,   0.0,   0.0,    0.0, 0.0],   # SSA
+    [  1.0,   0.0,  -1.0,   0.0,    0.0, 0.0],   # MM
+    [  2.0,   0.0,  -2.0,   0.0,    0.0, 0.0],   # MSF
+    [  2.0,   0.0,   0.0,   0.0,    0.0, 0.0],   # MF
+    [ -4.0,   1.0,   2.0,   0.0,  -90.0, 1.0],   # QQ
+    [ -3.0,   1.0,   1.0,   0.0,  -90.0, 1.0],   # Q1
+    [ -3.0,   3.0,  -1.0,   0.0,  -90.0, 1.0],   # RHO
+    [ -2.0,   1.0,   0.0,   0.0,  -90.0, 1.0],   # O1
+    [ -1.0,   1.0,   0.0,   0.0,  -90.0, 1.0],   # M1
+    [  0.0,  -1.0,   0.0,   0.0,  -90.0, 1.0],   # P1
+    [  0.0,   0.0,   0.0,   0.0,  180.0, 1.0],   # S1
+    [  0.0,   1.0,   0.0,   0.0,   90.0, 1.0],   # K1
+    [  1.0,   1.0,  -1.0,   0.0,   90.0, 1.0],   # J1
+    [  2.0,   1.0,   0.0,   0.0,   90.0, 1.0],   # OO
+    [ -4.0,   2.0,   2.0,   0.0,    0.0, 2.0],   # NN
+    [ -4.0,   4.0,   0.0,   0.0,    0.0, 2.0],   # MU
+    [ -3.0,   2.0,   1.0,   0.0,    0.0, 2.0],   # N2
+    [ -3.0,   4.0,  -1.0,   0.0,    0.0, 2.0],   # NU
+    [ -2.0,   2.0,   0.0,   0.0,    0.0, 2.0],   # M2
+    [ -1.0,   0.0,   1.0,   0.0,  180.0, 2.0],   # LAM
+    [ -1.0,   2.0,  -1.0,   0.0,  180.0, 2.0],   # L2
+    [  0.0,  -1.0,   0.0,   1.0,    0.0, 2.0],   # T2
+    [  0.0,   0.0,   0.0,   0.0,    0.0, 2.0],   # S2
+    [  0.0,   1.0,   0.0,  -1.0,  180.0, 2.0],   # R2
+    [  0.0,   2.0,   0.0,   0.0,    0.0, 2.0],   # K2
+    [  2.0,  -2.0,   0.0,   0.0,    0.0, 2.0],   # 2MS2
+    [ -4.0,   3.0,   0.0,   0.0,  -90.0, 3.0],   # 2MK3
+    [ -3.0,   3.0,   0.0,   0.0,  180.0, 3.0],   # M3
+    [ -2.0,   3.0,   0.0,   0.0,   90.0, 3.0],   # MK3
+    [ -5.0,   4.0,   1.0,   0.0,    0.0, 4.0],   # MN4
+    [ -4.0,   4.0,   0.0,   0.0,    0.0, 4.0],   # M4
+    [ -2.0,   2.0,   0.0,   0.0,    0.0, 4.0],   # MS4
+    [  0.0,   0.0,   0.0,   0.0,    0.0, 4.0],   # S4
+    [ -6.0,   6.0,   0.0,   0.0,    0.0, 6.0],   # M6
+    [  0.0,   0.0,   0.0,   0.0,    0.0, 6.0],   # S6
+    [ -8.0,   8.0,   0.0,   0.0,    0.0, 8.0],   # M8
+    ])
+# 37x5 matrix applied to [s, h, p, p1, 1], so the constant phase is folded
+# into the same matrix product; both blocks are pre-scaled to radians
+_V_COEF_RAD = 0.017453292519943 * _V_TABLE[:, 0:5]
+_V_DPHASE_RAD = 0.017453292519943 * _V_TABLE[:, 5]
+
+def harmonic_arrays(hcs):
+    " amplitudes H (m) and phase lags G (radians) of the 37 constituents as arrays "
+    rad = 0.017453292519943 # degrees to radians
+    H = np.array([hcs[const][0] for const in constit])
+    G = rad * np.array([hcs[const][1] for const in constit])
+    return(H, G)
+
+def predict_tides(hcs, jd, step_mins, series_days, H=None, G=None, dtype=np.float64):
     " predict tides using 37 harmonic constituents "
     #--------------------------------------------------------------------
     #  Input:
@@ -1791,6 +1946,10 @@ def predict_tides(hcs, jd, step_mins, series_days):
     #    jd          - julian date (UTC)
     #    step_mins   - predicion interval in minutes (float)
     #    series_days - length of record in days (float)
+    #    H, G        - optional amplitudes and phase lags (radians) from
+    #                  harmonic_arrays(hcs), computed here if not given
+    #    dtype       - float type of the constituent sum (default float64);
+    #                  np.float32 is faster but only good to about 1e-6 m
     #
     #    * the hcs dictionary is built by the program compile_hcs.py
     #
@@ -1808,30 +1967,11 @@ def predict_tides(hcs, jd, step_mins, series_days):
     #  Modified from predict_tides.f by D. Finlayson (2004 May 22)
     #------------------------------------------------------------------
     
-    #  Parameters
-    NC = 37   # Number of Harmonic Constituents (Full Set)
-    NH = 5    # Number of Harmonic Constituents (Model)
-
-    rad = 0.017453292519943 # degrees to radians
-    tnode = 30.5            # monthly interval to update lunar nodes
-    jd2000 = 2451544.50     # julian day of the year 2000
-    index = 0
-    constit = ('SA','SSA','MM','MSF','MF','2Q1','Q1','RHO','O1','M1','P1','S1',
-               'K1','J1','OO1','2N2','MU2','N2','NU2','M2','LAM2','L2','T2','S2',
-               'R2','K2','2SM2','2MK3','M3','MK3','MN4','M4','MS4','S4','M6','S6',
-               'M8')
-
     mean = hcs['mean']
 
-    H = []  # Harmonic Amplitude (m)
-    G = []  # Phase Lag (deg)
-    for const in constit:
-        H.append(hcs[const][0])
-        G.append(hcs[const][1])
-
-    #  Converting phase lags to radians
-    for i in range(0, NC):
-        G[i] = rad * G[i]
+    # Harmonic Amplitude (m) and Phase Lag (radians)
+    if H is None or G is None:
+        (H, G) = harmonic_arrays(hcs)
 
     # Tidal Predictions
 
@@ -1839,65 +1979,164 @@ def predict_tides(hcs, jd, step_mins, series_days):
     JD0 = jd
     step_days = step_mins / (24.0 * 60.0)
     series_length = int(series_days / step_days)
-    nodeint  = tnode / step_days
 
-    #  Loop over time
-    prediction = [None] * series_length
-    for j in range(0, series_length):
-        JD = JD0 + step_days * j
+    (JD, tide) = _tide_kernel(H, G, mean, JD0, step_days, series_length, dtype)
+    return(list(zip(JD, tide)))
 
-       # Nudge time a hair so that day fractions convert to times cleanly
-        JD = JD + 1.0e-9 
-        d2000 = JD - jd2000
-        tide = mean
+def _tide_kernel(H, G, mean, JD0, step_days, series_length, dtype=np.float64):
+    " tide heights from arrays of harmonic constants at series_length steps "
+    #--------------------------------------------------------------------
+    #  Numerical core of predict_tides, working only on arrays and
+    #  scalars so that it can be swapped for a compiled implementation.
+    #
+    #  Input:
+    #  ------
+    #    H, G          - amplitudes (m) and phase lags (radians), shape (NC,)
+    #    mean          - mean water level (m)
+    #    JD0           - julian date (UTC) of the first prediction
+    #    step_days     - prediction interval in days
+    #    series_length - number of predictions
+    #    dtype         - float type of the constituent sum; the julian
+    #                    dates and phase arguments are always float64
+    #
+    #  Output:
+    #  -------
+    #    JD, tide      - arrays of julian dates and tide elevations (m)
+    #------------------------------------------------------------------
+    (JD, V0, f_tab, u_tab, node_idx) = _tide_phases(JD0, step_days, series_length)
 
-        #  Computing V0 phases, updated each time step
-        V0 = v2000(d2000)
+    #  Reduced precision: wrap V0 to one cycle before dropping to dtype
+    if dtype != np.float64:
+        V0 = np.mod(V0, 2.0 * np.pi).astype(dtype)
+        (H, G) = (H.astype(dtype), G.astype(dtype))
+        (f_tab, u_tab) = (f_tab.astype(dtype), u_tab.astype(dtype))
 
-        #  Updating f-factors, u-phases every 30.5 days, centered in the
-        #  middle of the 30.5-day interval
+    #  Sum over all tidal constituents for all time steps at once
+    tide_sum = _tide_sum_numba() if series_length * NC >= _NUMBA_MIN_TERMS else None
+    if tide_sum is not None:
+        tide = tide_sum(H, G, mean, V0, f_tab, u_tab, node_idx)
+    else:
+        #  f*H and u-G change only once per node interval, so form them
+        #  on the small (Nseg, NC) tables before expanding to all steps
+        fH = (f_tab * H)[node_idx]
+        phase = V0 + (u_tab - G)[node_idx]
+        #  cos in place, then one fused multiply-and-sum over constituents
+        ne = _numexpr()
+        if ne is not None:
+            ne.evaluate('cos(phase)', out=phase)
+        else:
+            np.cos(phase, out=phase)
+        tide = mean + np.einsum('nk,nk->n', fH, phase, dtype=np.float64)
 
-        # Python: first iteration is 0 not 1, so changed test to 0, not 1
-        if(j % nodeint == 0):
-            (f, u) = node2000(d2000 + 15.25)
+    return(JD, tide)
 
-        #  Loop over tidal constituents
-        for i in range(0, NC):
-            r=f[i]*H[i]
-            phase=V0[i]+u[i]-G[i]
-            tide=tide+r*cos(phase)
+def _tide_phases(JD0, step_days, series_length):
+    " julian dates, V0 phases and node factor tables shared by all segments "
+    #--------------------------------------------------------------------
+    #  Output:
+    #  -------
+    #    JD            - julian dates, shape (series_length,)
+    #    V0            - V0 phases (radians), shape (series_length, NC)
+    #    f_tab, u_tab  - node factors and phases (radians) for each
+    #                    30.5-day interval, shape (Nseg, NC)
+    #    node_idx      - interval number of each time step
+    #------------------------------------------------------------------
+    tnode = 30.5            # monthly interval to update lunar nodes
+    jd2000 = 2451544.50     # julian day of the year 2000
 
-        #  Outputing prediction at time t
-        prediction[j] = (JD, tide)
-    return(prediction)
+    #  Time axis, nudged a hair so that day fractions convert to times cleanly
+    j = np.arange(series_length)
+    JD = JD0 + step_days * j + 1.0e-9
+    d2000 = JD - jd2000
 
-def v2000(d2000):
-    "  Computing V0 phases Reference: Schureman, 1976 "
-    NC = 37
-    rad = 0.017453292519943
-    V = [None] * NC
-    V0 = [None] * NC
+    #  Computing V0 phases for every time step, shape (series_length, NC)
+    V0 = v2000(d2000)
 
-    dphase = 360.0 * (d2000 % 1.0)
+    #  Updating f-factors, u-phases every 30.5 days, centered in the
+    #  middle of the 30.5-day interval. One table row per interval,
+    #  looked up by the integer interval number of each time step.
+    node_idx = np.floor((step_days * j + 1.0e-9) / tnode).astype(int)
+    Nseg = node_idx[-1] + 1 if series_length > 0 else 0
+    f_tab = np.empty((Nseg, NC))
+    u_tab = np.empty((Nseg, NC))
+    for k in range(Nseg):
+        (f_tab[k], u_tab[k]) = node2000(JD0 + tnode * k + 1.0e-9 - jd2000 + 15.25)
+
+    return(JD, V0, f_tab, u_tab, node_idx)
+
+def predict_tides_batch(H_all, G_all, mean_all, jd, step_mins, series_days):
+    " predict tides at many segments at once using 37 harmonic constituents "
+    #--------------------------------------------------------------------
+    #  Input:
+    #  ------
+    #    H_all       - amplitudes (m), shape (number of segments, NC)
+    #    G_all       - phase lags (radians), shape (number of segments, NC)
+    #    mean_all    - mean water levels (m), shape (number of segments,)
+    #    jd          - julian date (UTC)
+    #    step_mins   - predicion interval in minutes (float)
+    #    series_days - length of record in days (float)
+    #
+    #  Output:
+    #  -------
+    #    JD   - Julian Dates, shape (series_length,)
+    #    tide - tide elevations (meters), shape (series_length, number
+    #           of segments)
+    #
+    #  The V0 phases and node factors do not depend on the segment, so
+    #  they are computed once. Expanding cos(V0 + u - G) into
+    #  cos(V0 + u)*cos(G) + sin(V0 + u)*sin(G) turns the sum over
+    #  constituents for all segments into two matrix products.
+    #------------------------------------------------------------------
+    step_days = step_mins / (24.0 * 60.0)
+    series_length = int(series_days / step_days)
 
-    for i in range(0, 5):
-        V0[i] = 0.0
+    (JD, V0, f_tab, u_tab, node_idx) = _tide_phases(jd, step_days, series_length)
+    f = f_tab[node_idx]
+    arg = V0 + u_tab[node_idx]
+    ne = _numexpr()
+    if ne is not None:
+        (fcos, fsin) = (ne.evaluate('f * cos(arg)'), ne.evaluate('f * sin(arg)'))
+    else:
+        (fcos, fsin) = (f * np.cos(arg), f * np.sin(arg))
 
-    for i in range(5, 15):
-        V0[i] = 1.0 * dphase
+    #  one product of the stacked (steps, 2*NC) and (2*NC, segments)
+    #  matrices, so the only (steps, segments) array is the result
+    fcs = np.hstack((fcos, fsin))
+    HG = np.hstack((H_all * np.cos(G_all), H_all * np.sin(G_all)))
+    tide = fcs @ HG.T
+    tide += mean_all
+    return(JD, tide)
 
-    for i in range(15, 27):
-        V0[i] = 2.0 * dphase
+@functools.lru_cache(maxsize=1)
+def _tide_sum_numba():
+    " compiled constituent sum of _tide_kernel, or None without numba "
+    #  numba is imported and the kernel compiled (or loaded from the
+    #  on-disk cache) on the first long series, not at import time
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
 
-    for i in range(27, 30):
-        V0[i] = 3.0 * dphase
+    @njit(parallel=True, fastmath=True, error_model='numpy', cache=True)
+    def tide_sum(H, G, mean, V0, f_tab, u_tab, node_idx):
+        " constituent sum parallel over time steps "
+        N = V0.shape[0]
+        tide = np.empty(N)
+        for j in prange(N):
+            k = node_idx[j]
+            acc = mean
+            for i in range(NC):
+                acc += f_tab[k, i] * H[i] * np.cos(V0[j, i] + u_tab[k, i] - G[i])
+            tide[j] = acc
+        return tide
 
-    for i in range(30, 34):
-        V0[i] = 4.0 * dphase
+    return tide_sum
 
-    V0[34] = 6.0 * dphase
-    V0[35] = 6.0 * dphase
-    V0[36] = 8.0 * dphase
+def v2000(d2000):
+    "  Computing V0 phases Reference: Schureman, 1976 "
+    d2000 = np.asarray(d2000, dtype=float)
+
+    dphase = 360.0 * (d2000 % 1.0)
 
     T  = (d2000 + 36524.5)/36525
     s  = (270.437  + 481267.892 * T + 0.0025*T**2) % 360.0
@@ -1905,153 +2144,112 @@ def v2000(d2000):
     p  = (334.328  +   4069.040 * T - 0.0103*T**2) % 360.0
     p1 = (281.221  +      1.719 * T + 0.0005*T**2) % 360.0
 
-    V[0]  =    1.0 * h                                # SA
-    V[1]  =    2.0 * h                                # SSA
-    V[2]  =    1.0 * s + 0.0 * h - 1.0 * p            # MM
-    V[3]  =    2.0 * s + 0.0 * h - 2.0 * p            # MSF
-    V[4]  =    2.0 * s + 0.0 * h + 0.0 * p            # MF
-    V[5]  =  - 4.0 * s + 1.0 * h + 2.0 * p - 90.0     # QQ
-    V[6]  =  - 3.0 * s + 1.0 * h + 1.0 * p - 90.0     # Q1
-    V[7]  =  - 3.0 * s + 3.0 * h - 1.0 * p - 90.0     # RHO
-    V[8]  =  - 2.0 * s + 1.0 * h + 0.0 * p - 90.0     # O1
-    V[9]  =  - 1.0 * s + 1.0 * h + 0.0 * p - 90.0     # M1
-    V[10] =  - 0.0 * s - 1.0 * h + 0.0 * p - 90.0     # P1
-    V[11] =    180.0                                  # S1
-    V[12] =  - 0.0 * s + 1.0 * h + 0.0 * p + 90.0     # K1
-    V[13] =    1.0 * s + 1.0 * h - 1.0 * p + 90.0     # J1
-    V[14] =    2.0 * s + 1.0 * h + 0.0 * p + 90.0     # OO
-    V[15] =  - 4.0 * s + 2.0 * h + 2.0 * p            # NN
-    V[16] =  - 4.0 * s + 4.0 * h + 0.0 * p            # MU
-    V[17] =  - 3.0 * s + 2.0 * h + 1.0 * p            # N2
-    V[18] =  - 3.0 * s + 4.0 * h - 1.0 * p            # NU
-    V[19] =  - 2.0 * s + 2.0 * h + 0.0 * p            # M2
-    V[20] =  - 1.0 * s + 0.0 * h + 1.0 * p + 180.0    # LAM
-    V[21] =  - 1.0 * s + 2.0 * h - 1.0 * p + 180.0    # L2
-    V[22] =  - 0.0 * s - 1.0 * h + 1.0 * p1           # T2
-    V[23] =    0.0                                    # S2
-    V[24] =  - 0.0 * s + 1.0 * h - 1.0 * p1 + 180.0   # R2
-    V[25] =  - 0.0 * s + 2.0 * h + 0.0 * p1           # K2
-    V[26] =    2.0 * s - 2.0 * h + 0.0 * p            # 2MS2
-    V[27] =  - 4.0 * s + 3.0 * h + 0.0 * p - 90.0     # 2MK3
-    V[28] =  - 3.0 * s + 3.0 * h + 0.0 * p +180.0     # M3
-    V[29] =  - 2.0 * s + 3.0 * h + 0.0 * p + 90.0     # MK3
-    V[30] =  - 5.0 * s + 4.0 * h + 1.0 * p            # MN4
-    V[31] =  - 4.0 * s + 4.0 * h + 0.0 * p            # M4
-    V[32] =  - 2.0 * s + 2.0 * h + 0.0 * p            # MS4
-    V[33] =    0.0                                    # S4
-    V[34] =  - 6.0 * s + 6.0 * h + 0.0 * p            # M6
-    V[35] =    0.0                                    # S6
-    V[36] =  - 8.0 * s + 8.0 * h + 0.0 * p            # M8
+    #  Linear combinations of s, h, p, p1 and the daily phase for all
+    #  constituents (and all times if d2000 is an array) at once
+    V = np.stack([s, h, p, p1, np.ones_like(s)], axis=-1) @ _V_COEF_RAD.T
+    V0 = _V_DPHASE_RAD * dphase[..., None]
 
-    for i in range(0, NC):
-        V0[i] = rad * (V0[i] + V[i])
-    return(V0)
+    return(V0 + V)
 
 def node2000(d2000):
     "  Computing node factors f and phases u Ref.: Schureman Tables "
     rad = 0.017453292519943
-    NC = 37
+    # local names for the math functions (fast lookups in plain Python)
+    sin = math.sin
+    cos = math.cos
+    tan = math.tan
+    asin = math.asin
+    acos = math.acos
+    atan = math.atan
+    sqrt = math.sqrt
 
     T   = ( d2000 + 36524.5 )/36525.0
     N   = (259.183 - 1934.142 * T + 0.0021 * T * T) % 360.0
-    if(N < 0.0): N = N + 360.0
 
     N = rad*N
     p  = (334.328 + 4069.040 * T - 0.0103*T**2) % 360.0
     p = rad * p
 
     I   = acos(0.9136949 - 0.035696 * cos(N))
-    nu  = asin(0.0897056 * sin(N)/sin(I))
-    eta = atan(cos(I) * tan(nu))
-    nup = atan((sin(nu) * sin(2.0 * I))/(cos(nu)*sin(2.0*I) + 0.3347))
-    nupp2 = atan((sin(2.0*nu) * sin(I)**2)/(cos(2.0*nu)*sin(I)**2 + 0.0727))
+
+    # Common subexpressions of the inclination I
+    sI = sin(I)
+    cI = cos(I)
+    sI2 = sI*sI
+    s2I = sin(2.0 * I)
+    c2 = cos(I/2.0)**2
+    c4 = c2*c2
+    tI2 = tan(I/2.0)**2
+
+    nu  = asin(0.0897056 * sin(N)/sI)
+    cnu = cos(nu)
+    c2nu = cos(2.0*nu)
+    eta = atan(cI * tan(nu))
+    nup = atan((sin(nu) * s2I)/(cnu*s2I + 0.3347))
+    nupp2 = atan((sin(2.0*nu) * sI2)/(c2nu*sI2 + 0.0727))
     PP = p - eta
+    cos2PP = cos(2.0*PP)
+
+    # Node factors and phases shared by several constituents
+    fO1 = sI*c2/0.37988
+    fK1 = sqrt(0.8965 * s2I*s2I + 0.6001 * s2I * cnu + 0.1006)
+    fM2 = c4/0.9154
+    fM2_2 = fM2*fM2
+    two_en = 2.0*eta - 2.0*nu
+    four_en = 2.0*two_en
 
-    f = [None] * NC
-    f[0] = 1.000                                                        # SA
-    f[1] = 1.000                                                        # SSA
-    f[2] = (2.0/3.0-sin(I)**2)/0.5021                                   # MM
-    f[3] = cos(I/2.0)**4/0.9154                                         # MSF
-    f[4] = sin(I)**2/0.1578                                             # MF
-    f[5] = sin(I)*cos(I/2.0)**2/0.37988                                 # QQ
-    f[6] = sin(I)*cos(I/2.0)**2/0.37988                                 # Q1
-    f[7] = sin(I)*cos(I/2.0)**2/0.37988                                 # RHO1
-    f[8] = sin(I)*cos(I/2.0)**2/0.37988                                 # O1
-    Qai = sqrt(0.25 + 1.5 * cos(I) * cos(2.0 * PP)/cos(I/2.0)**2 + \
-               2.25 * cos(I)**2/cos(I/2.0)**4)
-    f[9] = f[8] * Qai                                                   # M1
-    f[10] = 1.000                                                       # P1
-    f[11] = 1.000                                                       # S1
-    f[12] = sqrt(0.8965 * sin(2.0 * I)**2 + 0.6001 * sin(2.0 * I) * \
-                 cos(nu) + 0.1006)                                      # K1
-    f[13] = sin(2.0 * I)/0.72137                                        # J1
-    f[14] = sin(I)*sin(I/2.0)**2/0.016358                               # OO
-    f[15] = cos(I/2.0)**4/0.9154                                        # NN
-    f[16] = cos(I/2.0)**4/0.9154                                        # MU2
-    f[17] = cos(I/2.0)**4/0.9154                                        # N2
-    f[18] = cos(I/2.0)**4/0.9154                                        # NU2
-    f[19] = cos(I/2.0)**4/0.9154                                        # M2
-    f[20] = cos(I/2.0)**4/0.9154                                        # LAM
-    Rai = sqrt(1.0 - 12.0*tan(I/2.0)**2 * cos(2.0*PP) + 36.0 * \
-               tan(I/2.0)**4)
-    f[21] = f[19] * Rai                                                 # L2
-    f[22] = 1.000                                                       # T2
-    f[23] = 1.000                                                       # S2
-    f[24] = 1.000                                                       # R2
-    f[25] = sqrt( 19.0444*sin(I)**4 + 2.7702*cos(2.0*nu)* \
-                  sin(I)**2 + 0.0981)                                   # K2
-    f[26] = cos(I/2.0)**4/0.9154                                        # 2SM2
-    f[27] = f[19]**2*f[12]                                              # 2MK3
-    f[28] = cos(I/2.0)**6/0.8758                                        # M3
-    f[29] = f[19]*f[12]                                                 # MK3
-    f[30] = f[19]**2                                                    # MN4
-    f[31] = f[19]**2                                                    # M4
-    f[32] = f[19]**2                                                    # MS4
+    f = np.empty(NC)
+    f[0:2] = 1.000                                                      # SA, SSA
+    f[2] = (2.0/3.0-sI2)/0.5021                                         # MM
+    f[3] = fM2                                                          # MSF
+    f[4] = sI2/0.1578                                                   # MF
+    f[5:9] = fO1                                                        # QQ, Q1, RHO1, O1
+    Qai = sqrt(0.25 + 1.5 * cI * cos2PP/c2 + 2.25 * cI*cI/c4)
+    f[9] = fO1 * Qai                                                    # M1
+    f[10:12] = 1.000                                                    # P1, S1
+    f[12] = fK1                                                         # K1
+    f[13] = s2I/0.72137                                                 # J1
+    f[14] = sI*sin(I/2.0)**2/0.016358                                   # OO
+    f[15:21] = fM2                                                      # NN, MU2, N2, NU2, M2, LAM
+    Rai = sqrt(1.0 - 12.0*tI2 * cos2PP + 36.0 * tI2*tI2)
+    f[21] = fM2 * Rai                                                   # L2
+    f[22:25] = 1.000                                                    # T2, S2, R2
+    f[25] = sqrt( 19.0444*sI2*sI2 + 2.7702*c2nu*sI2 + 0.0981)           # K2
+    f[26] = fM2                                                         # 2SM2
+    f[27] = fM2_2*fK1                                                   # 2MK3
+    f[28] = c4*c2/0.8758                                                # M3
+    f[29] = fM2*fK1                                                     # MK3
+    f[30:33] = fM2_2                                                    # MN4, M4, MS4
     f[33] = 1.000                                                       # S4
-    f[34] = f[19]**3                                                    # M6
+    f[34] = fM2_2*fM2                                                   # M6
     f[35] = 1.000                                                       # S6
-    f[36] = f[19]**4                                                    # M8
+    f[36] = fM2_2*fM2_2                                                 # M8
 
-    u = [None] * NC
-    u[0] =  0.0                     # SA
-    u[1] =  0.0                     # SSA
-    u[2] =  0.0                     # MM
-    u[3] =  0.0                     # MSF
+    u = np.empty(NC)
+    u[0:4] =  0.0                   # SA, SSA, MM, MSF
     u[4] = -2.0*eta                 # MF
-    u[5] =  2.0*eta - nu            # QQ
-    u[6] =  2.0*eta - nu            # Q1
-    u[7] =  2.0*eta - nu            # RHO
-    u[8] =  2.0*eta - nu            # O1
+    u[5:9] =  2.0*eta - nu          # QQ, Q1, RHO, O1
     Q = atan( 0.483*tan(PP))
     u[9] =  1.0*eta - nu + Q        # M1
-    u[10] = 0.0                     # P1
-    u[11] = 0.0                     # S1
+    u[10:12] = 0.0                  # P1, S1
     u[12] = -nup                    # K1
     u[13] = -nu                     # J1
     u[14] = -2.0*eta - nu           # OO
-    u[15] =  2.0*eta - 2.0*nu       # NN
-    u[16] =  2.0*eta - 2.0*nu       # MU2
-    u[17] =  2.0*eta - 2.0*nu       # N2
-    u[18] =  2.0*eta - 2.0*nu       # NU2
-    u[19] =  2.0*eta - 2.0*nu       # M2
-    u[20] =  2.0*eta - 2.0*nu       # LAM
-    R = atan( sin(2.0*PP)/( 1.0/( 6.0*tan(I/2.0)**2 ) - cos(2.0*PP) ) )
-    u[21] =  2.0*eta - 2.0*nu - R   # L2
-    u[22] =  0.0                    # T2
-    u[23] =  0.0                    # S2
-    u[24] =  0.0                    # R2
+    u[15:21] =  two_en              # NN, MU2, N2, NU2, M2, LAM
+    R = atan( sin(2.0*PP)/( 1.0/( 6.0*tI2 ) - cos2PP ) )
+    u[21] =  two_en - R             # L2
+    u[22:25] = 0.0                  # T2, S2, R2
     u[25] = -nupp2                  # K2
-    u[26] = -2.0*eta + 2.0*nu       # 2SM2
-    u[27] = 4.0*eta - 4.0*nu + nup  # 2MK3
-    u[28] = 3.0*eta - 3.0*nu        # M3
-    u[29] = 2.0*eta - 2.0*nu - nup  # MK3
-    u[30] = 4.0*eta - 4.0*nu        # MN4
-    u[31] = 4.0*eta - 4.0*nu        # M4
-    u[32] = 2.0*eta - 2.0*nu        # MS4
+    u[26] = -two_en                 # 2SM2
+    u[27] = four_en + nup           # 2MK3
+    u[28] = 1.5*two_en              # M3
+    u[29] = two_en - nup            # MK3
+    u[30:32] = four_en              # MN4, M4
+    u[32] = two_en                  # MS4
     u[33] = 0.0                     # S4
-    u[34] = 6.0*eta - 6.0*nu        # M6
+    u[34] = 3.0*two_en              # M6
     u[35] = 0.0                     # S6
-    u[36] = 8.0*eta - 8.0*nu        # M8
+    u[36] = 2.0*four_en             # M8
     return(f, u)
 
 #----------------------------------------------------------------------------
@@ -26385,6 +26583,23 @@ def ps_segments():
         'longitude': -122.39393000000001}}
 
     return result.copy()
+
+@functools.lru_cache(maxsize=1)
+def _segment_arrays():
+    '''
+    returns the harmonic constants of ps_segments() as read-only arrays with
+    one row per segment, built once and cached: (keys, H_all, G_all, mean_all)
+    '''
+    harmonic_constants = ps_segments()
+    keys = tuple(harmonic_constants.keys())
+    H_all = np.empty((len(keys), NC))
+    G_all = np.empty((len(keys), NC))
+    for i, key in enumerate(keys):
+        H_all[i], G_all[i] = harmonic_arrays(harmonic_constants[key]['hcs'])
+    mean_all = np.array([harmonic_constants[key]['hcs']['mean'] for key in keys])
+    for arr in (H_all, G_all, mean_all):
+        arr.setflags(write=False)
+    return keys, H_all, G_all, mean_all
  
 #----------------------------------------------------------------------------
 #                                                                           
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+import pstide
+
+
+@pytest.fixture(autouse=True)
+def _in_tmp_path(tmp_path, monkeypatch):
+    # run_pstide writes its csv outputs to the current directory
+    monkeypatch.chdir(tmp_path)
+
+
+def _run(**kwargs):
+    return pstide.run_pstide(segment=497, length=1.0, show_plot=False, verbose=False, **kwargs)
+
+
+# starts before and after the nanosecond range of pandas (1677-2262);
+# US/Pacific is local mean time (-07:52:58) in the tz database before 1883
+@pytest.mark.parametrize('start, pacific, first_utc', [
+    ('1650-01-01T00:00:00', False, '1650-01-01 00:00:00+00:00'),
+    ('1650-01-01T00:00:00', True, '1650-01-01 07:52:58+00:00'),
+    ('2300-01-01T00:00:00', False, '2300-01-01 00:00:00+00:00'),
+    ('2300-01-01T00:00:00', True, '2300-01-01 08:00:00+00:00'),
+])
+def test_start_outside_nanosecond_range(start, pacific, first_utc):
+    df = _run(start=start, pacific=pacific)['tides_selected_segment']
+    assert str(df['Datetime UTC'].iloc[0]) == first_utc
+    assert df['Datetime UTC'].dtype == 'datetime64[s, UTC]'
+    assert df['Datetime PST/PDT'].dtype == 'datetime64[s, US/Pacific]'
+    assert np.isfinite(df['Tide (meters MLLW)']).all()
+
+
+@pytest.mark.parametrize('interval', [0.25, 60])
+def test_datetime_resolution_is_seconds(interval):
+    df = _run(start='2025-03-01T00:00:00', interval=interval)['tides_all_segments']
+    assert df['Datetime UTC'].dtype == 'datetime64[s, UTC]'
+    assert df['Datetime PST/PDT'].dtype == 'datetime64[s, US/Pacific]'